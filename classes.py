@@ -1,35 +1,70 @@
+import csv
 import datetime
 import os
 import subprocess
+from collections import defaultdict
+from operator import itemgetter
 from pathlib import Path
-import pandas as pd
+
+
+COLUMNS = ['tags', 'name', 'created', 'changed', 'note']
 
 
 def save():
-    df.to_csv('df.csv', index=False, sep=';')
+    with open('df.csv', 'w', newline='') as file:
+        writer = csv.DictWriter(file, fieldnames=COLUMNS, delimiter=';')
+        writer.writeheader()
+        writer.writerows(records.values())
 def create_df():
+    records = {}
     try:
-        df = pd.read_csv('df.csv', delimiter=';')
+        with open('df.csv', newline='') as file:
+            for row in csv.DictReader(file, delimiter=';'):
+                records[row['name']] = {column: row.get(column) or '' for column in COLUMNS}
     except FileNotFoundError:
-        df = pd.DataFrame(columns=['tags', 'name', 'created', 'changed', 'note'])
+        pass
     if os.path.exists('notes')==False:
         os.mkdir('notes')
-    return df
+    return records
+
+
+def split_tags(tags):
+    return set(tags.lower().replace(',', ' ').split())
+
+
+def index_tags(name, tags):
+    for tag in split_tags(tags):
+        tag_index[tag].add(name)
+
 
+def unindex_tags(name, tags):
+    for tag in split_tags(tags):
+        tag_index[tag].discard(name)
+        if not tag_index[tag]:
+            del tag_index[tag]
 
-df = create_df()
 
-class Notebook(pd.DataFrame):
-    def add_note(self, note):
-        self.loc[len(self), ['name', 'created', 'note']] = [note.name.value, note.created, note]
-        save()
-    def change_note(self, note,changed=datetime.datetime.now().strftime('%m/%d/%Y, %H:%M')):
-        self.loc[df['name'] == note.name.value, ['changed']] = changed
-        save()
+def new_record(name, created):
+    return {'tags': '', 'name': name, 'created': created, 'changed': '', 'note': ''}
+
+
+def format_table(rows):
+    rows = list(rows)
+    widths = {column: max([len(column)] + [len(row[column]) for row in rows]) for column in COLUMNS}
+    lines = ['  '.join(column.ljust(widths[column]) for column in COLUMNS)]
+    lines.extend('  '.join(row[column].ljust(widths[column]) for column in COLUMNS) for row in rows)
+    return '\n'.join(lines)
+
+
+def sorted_records(column):
+    return sorted(records.values(), key=itemgetter(column), reverse=True)
+
+
+records = create_df()
+tag_index = defaultdict(set)
+for _name, _record in records.items():
+    index_tags(_name, _record['tags'])
 
-    def remove_note(self, note):
-        self = self.loc[self['name'] != note.name.value]
-        save()
 
 class Field:
     def __init__(self, value):
@@ -74,55 +109,58 @@ class Note():
 
 
     def add_tags(self, new_tag):
+        record = records[self.name.value]
+        unindex_tags(self.name.value, record['tags'])
         self.tags = new_tag
-        df.loc[df['name'] == self.name.value, ['tags']] = self.tags
+        record['tags'] = self.tags
+        index_tags(self.name.value, self.tags)
 
 
 
     def delete_tags(self):
+        record = records[self.name.value]
+        unindex_tags(self.name.value, record['tags'])
         self.tags = ''
-        df.loc[df['name'] == self.name.value, ['tags']] = ''
+        record['tags'] = ''
 
     def add_note(self):
         try:
             subprocess.call(['open', '-a', 'TextEdit', f'./notes/{self.name.value}.txt'])
-            df.loc[len(df), ['name', 'created']] = [self.name.value, self.created]
+            records[self.name.value] = new_record(self.name.value, self.created)
         except:
             try:
                 subprocess.call(['notepad', f'./notes/{self.name.value}.txt'])
-                df.loc[len(df), ['name', 'created']] = [self.name.value, self.created]
+                records[self.name.value] = new_record(self.name.value, self.created)
             except FileNotFoundError:
                 print("Text editor not found")
 
     def change_note(self, changed=datetime.datetime.now().strftime('%m/%d/%Y, %H:%M')):
         try:
             subprocess.call(['open', '-a', 'TextEdit', f'./notes/{self.name.value}.txt'])
-            df.loc[df['name'] == self.name.value, ['changed']] = changed
+            records[self.name.value]['changed'] = changed
         except:
             try:
                 subprocess.call(['notepad', f'./notes/{self.name.value}.txt'])
-                df.loc[df['name'] == self.name.value, ['changed']] = changed
+                records[self.name.value]['changed'] = changed
             except FileNotFoundError:
                 print("Text editor not found")
 
     def remove(self):
-        global df
         os.remove(f'./notes/{self.name.value}.txt')
-        df = df.loc[df['name'] != self.name.value]
-        return df
+        record = records.pop(self.name.value)
+        unindex_tags(self.name.value, record['tags'])
 
 
 
 def synk():
-    global df
     names = os.listdir('notes')
     names = [i[:-4] for i in names]
     for name in names:
-        if df['name'].isin([name]).any()==False:
+        if name not in records:
             ex_note = Note(name)
-            df.loc[len(df), ['name', 'created']] = [ex_note.name.value, ex_note.created]
-    save()
-    df = df.loc[df['name'].isin(names)==True]
+            records[name] = new_record(ex_note.name.value, ex_note.created)
+    for name in records.keys() - set(names):
+        unindex_tags(name, records.pop(name)['tags'])
     save()
 
 synk()
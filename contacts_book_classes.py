@@ -1,10 +1,14 @@
 from collections import UserDict
-from datetime import datetime
-from difflib import SequenceMatcher
-import pickle
+from datetime import date
+from itertools import islice
+import os
 import re
 
 
+_EMAIL_RE = re.compile(r"\b[A-Za-z][\w+.]+@\w+\.[a-z]{2,3}\Z")
+_RECORD_TEMPLATE = "Name: %s Birthday: %s; Phone: %s Email: %s"
+
+
 def error_handler(func):
     def wrapper(*args):
         try:
@@ -21,18 +25,42 @@ def error_handler(func):
     return wrapper
 
 
+def restore_slots(obj, state):
+    # books pickled before __slots__ was added carry a plain __dict__ state
+    if isinstance(state, tuple):
+        state = state[1]
+    for key, value in state.items():
+        object.__setattr__(obj, key, value)
+
+
 class Field:
     """Parent class for all fields"""
 
+    __slots__ = ('__value', '_str')
+
     def __init__(self, value):
         self.__value = None
         self.value = value
 
     def __str__(self):
-        return self.value
+        return self._str
 
     def __repr__(self):
-        return self.value
+        return self._str
+
+    def __setstate__(self, state):
+        if isinstance(state, tuple):
+            state = state[1]
+        # older books kept the value in a per-class attribute such as _Phone__value
+        values = [value for key, value in state.items() if key.endswith('__value') and value is not None]
+        self._set(values[0] if values else None)
+
+    def _to_str(self, value):
+        return value
+
+    def _set(self, value):
+        self.__value = value
+        self._str = self._to_str(value)
 
     @property
     def value(self):
@@ -40,106 +68,97 @@ class Field:
 
     @value.setter
     def value(self, value):
-        self.__value = value
+        self._set(value)
 
 
 class Name(Field):
     """Required field with username"""
-    pass
+
+    __slots__ = ()
 
 
 class Phone(Field):
     """Optional field with phone numbers"""
 
-    @property
-    def value(self):
-        return self.__value
+    __slots__ = ()
 
-    @value.setter
+    @Field.value.setter
     def value(self, value):
-        if len(value) != 12:
-            raise ValueError("Phone must contains 12 symbols.")
-        if not value.startswith('380'):
-            raise ValueError("Phone must starts from '380'.")
-        if not value.isnumeric():
-            raise ValueError("Phone number must include digits only.")
-        self.__value = value
+        if len(value) != 12 or not value.startswith('380') or not value.isdigit():
+            raise ValueError("Phone must contains 12 digits and starts from '380'.")
+        self._set(value)
 
 
 class Birthday(Field):
     """Creating 'birthday' fields"""
 
-    def __str__(self):
-        return self.value.strftime("%d-%m-%Y")
-
-    def __repr__(self):
-        return str(self)
+    __slots__ = ()
 
-    @property
-    def value(self):
-        return self.__value
+    def _to_str(self, value):
+        return value.strftime("%d-%m-%Y")
 
-    @value.setter
+    @Field.value.setter
     def value(self, value):
-        today = datetime.now().date()
         try:
-            value = datetime.strptime(value, "%d-%m-%Y").date()
-        except:
+            day, month, year = value.split('-')
+            if not (day.isdigit() and month.isdigit() and year.isdigit()) \
+                    or len(day) > 2 or len(month) > 2 or len(year) != 4:
+                raise ValueError
+            value = date(int(year), int(month), int(day))
+        except (ValueError, OverflowError):
             raise ValueError("Birthday must be in a format 'DD-MM-YYYY'")
-        if value > today:
+        if value > date.today():
             raise ValueError("Birthday can't be bigger than current date.")
-        self.__value = value
+        self._set(value)
 
 
 class Email(Field):
     """Creating 'email fields'"""
 
-    def __str__(self):
-        return self.value
-
-    def __repr__(self):
-        return str(self)
-
-    @property
-    def value(self):
-        return self.__value
+    __slots__ = ()
 
-    @value.setter
+    @Field.value.setter
     def value(self, value):
-        if not re.findall(r"\b[A-Za-z][\w+.]+@\w+[.][a-z]{2,3}", value):
+        if not _EMAIL_RE.search(value):
             raise ValueError('Wrong format. Example: "mymail@gmail.com"')
-        self.__value = value
+        self._set(value)
 
 
 class Record:
     """Class for add, remove, change fields"""
 
+    __slots__ = ('birthday', 'email', 'name', 'phones')
+
     def __init__(self, name: Name, phone: Phone = None, birthday: Birthday = None, email: Email = None):
 
         self.birthday = birthday
         self.email = email
         self.name = name
-        self.phones = []
+        self.phones = {}
         if phone:
-            self.phones.append(phone)
+            self.phones[phone.value] = phone
 
     def __str__(self) -> str:
-        return f'Name: {self.name} Phone: {", ".join([str(p) for p in self.phones])} {"Birthday: " + str(self.birthday) if self.birthday else ""} Email: {str(self.email) if self.email else ""}'
+        return f'Name: {self.name} Phone: {", ".join([str(p) for p in self.phones.values()])} {"Birthday: " + str(self.birthday) if self.birthday else ""} Email: {str(self.email) if self.email else ""}'
 
     def __repr__(self) -> str:
         return str(self)
 
+    def __setstate__(self, state):
+        # records pickled by earlier versions keep their phones in a list
+        restore_slots(self, state)
+        if isinstance(self.phones, list):
+            self.phones = {phone.value: phone for phone in self.phones}
+
     def add_phone(self, phone):
-        self.phones.append(phone)
+        self.phones[phone.value] = phone
         return f"Phone {phone} was added successfully"
 
     def change(self, old_phone: Phone, new_phone: Phone):
-        for phone in self.phones:
-            if phone.value == old_phone.value:
-                self.phones.remove(phone)
-                self.phones.append(new_phone)
-                return f"Phone {old_phone} was successfully changed to {new_phone}"
+        if self.phones.pop(old_phone.value, None) is None:
             return f"Phone number '{old_phone}' was not found in the record"
+        self.phones[new_phone.value] = new_phone
+        return f"Phone {old_phone} was successfully changed to {new_phone}"
 
     def add_birthday(self, birthday: Birthday):
         self.birthday = birthday
@@ -147,9 +166,9 @@ class Record:
     def add_email(self, email: Email):
         self.email = email
 
-    def days_to_birthday(self):
+    def days_to_birthday(self, today: date = None):
 
-        cur_date = datetime.now().date()
+        cur_date = today or date.today()
         cur_year = cur_date.year
 
         if self.birthday:
@@ -166,7 +185,7 @@ class Record:
             return f"{self.name}'s birthday is unknown"
 
     def show_contact_info(self):
-        phones = ", ".join([str(ph) for ph in self.phones])
+        phones = ", ".join([str(ph) for ph in self.phones.values()])
         return {
             "name": str(self.name.value),
             "phone": phones,
@@ -176,48 +195,87 @@ class Record:
 
     def remove_phone(self, phone):
         phone = Phone(phone)
-        for ph in self.phones:
-            if ph.value == phone.value:
-                self.phones.remove(ph)
-                return f"Phone {ph} was successfully removed from {self.name}"
+        ph = self.phones.pop(phone.value, None)
+        if ph is not None:
+            return f"Phone {ph} was successfully removed from {self.name}"
         return f"Number {phone} not found"
 
 
 class AddressBook(UserDict):
     """Class for creating address book"""
 
+    def __init__(self, *args, **kwargs):
+        self._changed = set()
+        self._removed = set()
+        self._migrated = False
+        super().__init__(*args, **kwargs)
+
+    def __setitem__(self, name, record):
+        self.data[name] = record
+        self.mark_changed(name)
+
+    def __delitem__(self, name):
+        del self.data[name]
+        self._changed.discard(name)
+        self._removed.add(name)
+
     def open_file(self):
-        with open('AddressBook.txt', 'rb') as open_file:
-            self.data = pickle.load(open_file)
+        import shelve
+        with shelve.open('AddressBook') as shelf:
+            self.data = dict(shelf)
+        self._changed = set()
+        self._removed = set()
+        self._migrated = False
+        if not self.data and os.path.exists('AddressBook.txt'):
+            # book saved as a single pickle by earlier versions, moved to the shelf on next save
+            import pickle
+            with open('AddressBook.txt', 'rb', buffering=1 << 20) as open_file:
+                self.data = pickle.load(open_file)
+            self._changed = set(self.data)
+            self._migrated = True
         return self.data
 
     def write_file(self):
-        with open('AddressBook.txt', 'wb') as write_file:
-            pickle.dump(self.data, write_file)
+        """Stores only the records changed or removed since the last save"""
+        import pickle
+        import shelve
+        with shelve.open('AddressBook', protocol=pickle.HIGHEST_PROTOCOL) as shelf:
+            for name in self._removed:
+                if name in shelf:
+                    del shelf[name]
+            for name in self._changed:
+                shelf[name] = self.data[name]
+        self._changed.clear()
+        self._removed.clear()
+        if self._migrated:
+            os.remove('AddressBook.txt')
+            self._migrated = False
+
+    def mark_changed(self, name):
+        self._changed.add(name)
+        self._removed.discard(name)
 
     def search_in_file(self, data):
-        result = ""
-        for record in self.data.values():
-            if str(data).lower() in str(record.name).lower():
-                result += f"Name: {record.name} Birthday: {record.birthday} Phone: {','.join([ph.value for ph in record.phones])}\n"
-            else:
-                for phone in record.phones:
-                    if str(data).lower() in str(phone):
-                        result += f"Name: {record.name} Birthday: {record.birthday} Phone: {','.join([ph.value for ph in record.phones])}\n"
-        return result
+        needle = str(data).lower()
+        result = []
+        for name, record in self.data.items():
+            if needle in name.lower() or any(needle in phone for phone in record.phones):
+                phones = ','.join(record.phones)
+                result.append(f"Name: {record.name} Birthday: {record.birthday} Phone: {phones}\n")
+        return "".join(result)
 
     def add_record(self, record: Record):
-        self.data[record.name.value] = record
+        self[record.name.value] = record
 
     def remove_record(self, record):
-        self.data.pop(record.name.value, None)
+        self.pop(record.name.value, None)
 
     def show_one_record(self, name):
-        return f"Name: {name}; Birthday: {self.data[name].birthday}; Phone: {', '.join([str(phone.value) for phone in self.data[name].phones])}; Email: {self.data[name].email}"
+        return f"Name: {name}; Birthday: {self.data[name].birthday}; Phone: {', '.join(self.data[name].phones)}; Email: {self.data[name].email}"
 
     def show_all_records(self):
         return "\n".join(
-            f"Name: {rec.name} Birthday: {rec.birthday}; Phone: {', '.join([ph.value for ph in rec.phones])} Email: {rec.email}"
+            _RECORD_TEMPLATE % (rec.name, rec.birthday, ", ".join(rec.phones), rec.email)
             for rec
             in self.data.values())
 
@@ -225,19 +283,12 @@ class AddressBook(UserDict):
         record = self.data.get(username)
         if record:
             record.change(old_n, new_n)
+            self.mark_changed(username)
 
     def iterator(self, n):
-        records = list(self.data.keys())
-        records_num = len(records)
-        count = 0
-        result = ""
-        if n > records_num:
-            n = records_num
-        for rec in self.data.values():
-            if count < n:
-                result += f'{rec.name} (B-day: {rec.birthday}): {", ".join([p.value for p in rec.phones])}\n'
-                count += 1
-        yield result
+        result = [f'{rec.name} (B-day: {rec.birthday}): {", ".join(rec.phones)}\n'
+                  for rec in islice(self.data.values(), max(n, 0))]
+        yield "".join(result)
 
 
 ADDRESSBOOK = AddressBook()
@@ -274,29 +325,28 @@ def add_phone(*args):
     """Adds new contact, requires name and phone"""
     name = Name(args[0])
     phone = Phone(args[1])
-    rec = ADDRESSBOOK.get(name.value)
+    rec = ADDRESSBOOK.data.get(name.value)
 
-    if name.value in ADDRESSBOOK:
+    if rec is not None:
         while True:
             user_input = input(
                 f"Contact with this name already exist, do you want to rewrite it (1), create new record (2) or add this number to '{name.value}' (3)?\n")
             if user_input == "2":
                 name.value += "(1)"
-                rec = ADDRESSBOOK.get(name.value)
+                rec = ADDRESSBOOK.data.get(name.value)
                 break
             elif user_input == "1":
                 ADDRESSBOOK.remove_record(rec)
-                rec = ADDRESSBOOK.get(name.value)
+                rec = None
                 break
             elif user_input == "3":
                 break
             else:
                 print("Please type '1' or '2' or '3' to continue")
 
-    if not phone.value.isnumeric():
-        raise ValueError
     if rec:
         rec.add_phone(phone)
+        ADDRESSBOOK.mark_changed(name.value)
     else:
         rec = Record(name, phone)
         ADDRESSBOOK.add_record(rec)
@@ -316,9 +366,6 @@ def change(*args):
     old_ph = Phone(args[1])
     new_ph = Phone(args[2])
 
-    if not new_ph.value.isnumeric():
-        raise ValueError
-
     ADDRESSBOOK.change_record(name.value, old_ph, new_ph)
     return f"You just changed number for contact '{name}'. New number is '{new_ph}'"
 
@@ -353,6 +400,7 @@ def add_email(*args):
 
     if rec:
         rec.add_email(email)
+        ADDRESSBOOK.mark_changed(name.value)
         return f"Email for {name.value} was added"
     return f"{name.value} is not in your contact list"
 
@@ -365,6 +413,7 @@ def add_birthday(*args):
 
     if rec:
         rec.add_birthday(birthday)
+        ADDRESSBOOK.mark_changed(name.value)
         return f"The birthday for {name.value} was added"
     return f"{name.value} is not in your contact list"
 
@@ -387,6 +436,7 @@ def delete_phone(*args):
     phone = Phone(args[1])
     if name.value in ADDRESSBOOK:
         ADDRESSBOOK[name.value].remove_phone(phone.value)
+        ADDRESSBOOK.mark_changed(name.value)
         return f"Phone {phone} was deleted from {name.value} "
     return f"Contact {name.value} does not exist"
 
@@ -406,8 +456,10 @@ def show_list(*args):
     return "Your address book is empty"
 
 
+@error_handler
 def search(*args):
-    return ADDRESSBOOK.search_in_file(str(args[0]))
+    """Shows contacts whose name or phone contains the given text, all of them without one"""
+    return ADDRESSBOOK.search_in_file(str(args[0]) if args else "")
 
 
 COMMANDS = {
@@ -426,18 +478,64 @@ COMMANDS = {
     add_email: "add email",
 }
 
+_KEYWORDS = tuple(COMMANDS.values())
+
+_DISPATCH = {}
+for _command, _key_word in COMMANDS.items():
+    _first, _, _second = _key_word.partition(" ")
+    _DISPATCH.setdefault(_first, {})[_second or None] = _command
+
+
+# Bit-parallel (Myers/Hyyro) edit distance with every keyword packed into one integer:
+# each keyword owns a lane of len(key_word) bits followed by a zero guard bit that
+# swallows carries, so one pass over the input scores all keywords at once.
+_KEYWORD_PEQ = {}
+_KEYWORD_MASK = 0
+_KEYWORD_LOW = 0
+_KEYWORD_LANES = []
+_offset = 0
+for _key_word in _KEYWORDS:
+    for _i, _char in enumerate(_key_word):
+        _KEYWORD_PEQ[_char] = _KEYWORD_PEQ.get(_char, 0) | 1 << (_offset + _i)
+    _KEYWORD_LANES.append(((1 << len(_key_word)) - 1) << _offset)
+    _KEYWORD_MASK |= _KEYWORD_LANES[-1]
+    _KEYWORD_LOW |= 1 << _offset
+    _offset += len(_key_word) + 1
+
+
+def keyword_distances(text):
+    """Levenshtein distances from text to each keyword, in _KEYWORDS order"""
+    mask = _KEYWORD_MASK
+    pv, mv = mask, 0
+    for char in text:
+        eq = _KEYWORD_PEQ.get(char, 0)
+        xv = eq | mv
+        xh = ((((eq & pv) + pv) & mask) ^ pv) | eq
+        ph = mv | (~(xh | pv) & mask)
+        mh = pv & xh
+        ph = ((ph << 1) & mask) | _KEYWORD_LOW
+        mh = (mh << 1) & mask
+        pv = mh | (~(xv | ph) & mask)
+        mv = ph & xv
+    # the last column starts at len(text) and moves by +1/-1 per set pv/mv bit
+    return [len(text) + (pv & lane).bit_count() - (mv & lane).bit_count() for lane in _KEYWORD_LANES]
+
 
 def command_parser(user_input):
+    parts = user_input.split()
+    handlers = _DISPATCH.get(parts[0]) if parts else None
+    if handlers:
+        if len(parts) > 1 and parts[1] in handlers:
+            return handlers[parts[1]], parts[2:]
+        if None in handlers:
+            return handlers[None], parts[1:]
     ratio = 0
     possible_command = ""
-    for command, key_word in COMMANDS.items():
-        if user_input.startswith(key_word):
-            return command, user_input.replace(key_word, "").strip().split(" ")
-        else:
-            a = SequenceMatcher(None, user_input, key_word).ratio()
-            if a > ratio:
-                ratio = a
-                possible_command = key_word
+    for key_word, distance in zip(_KEYWORDS, keyword_distances(user_input)):
+        a = 1 - distance / max(len(user_input), len(key_word))
+        if a > ratio:
+            ratio = a
+            possible_command = key_word
     print(f"Maybe you meant '{possible_command}' ?")
     return None, None
 
@@ -446,11 +544,7 @@ def main():
     print(
         "Here's a list of available commands: 'Hello', 'Add contact', 'Add birthday', 'Add email', 'When birthday', "
         "'Delete contact', 'Change', 'Phone', 'Show all', 'Delete phone', 'Search', 'Help', 'Exit'")
-    try:
-        ADDRESSBOOK.open_file()
-    except FileNotFoundError:
-        ADDRESSBOOK.write_file()
-        ADDRESSBOOK.open_file()
+    ADDRESSBOOK.open_file()
 
     while True:
         user_input = input(">>>")
@@ -1,5 +1,5 @@
 
-from classes import Note, df, synk, create_df as load
+from classes import Note, records, tag_index, split_tags, synk, format_table, sorted_records
 from decorator import input_error
 from classes import save
 
@@ -19,8 +19,7 @@ def wrong_command():
 
 def show_all(a):
     synk()
-    df = load()
-    return df
+    return format_table(records.values())
 
 def help_():
     a = ["add name -   creates text file named 'name'\n",
@@ -76,9 +75,8 @@ def parser_string(u_input):
 
 @input_error
 def add_note(args):
-    df = load()
     name = str(args[0])
-    if df['name'].isin([name]).any():
+    if name in records:
         raise FileExistsError
     else:
         ex_note = Note(name)
@@ -90,9 +88,8 @@ def add_note(args):
 @input_error
 def change_note(args):
     synk()
-    df = load()
     name = str(args[0])
-    if df['name'].isin([name]).any() == False:
+    if name not in records:
         raise FileNotFoundError
     else:
         ex_note = Note(name)
@@ -103,22 +100,20 @@ def change_note(args):
 
 @input_error
 def remove_note(args):
-    df = load()
     name = args[0]
-    if df['name'].isin([name]).any() == False:
+    if name not in records:
         raise FileNotFoundError
     else:
         ex_note = Note(name)
-        df = ex_note.remove()
+        ex_note.remove()
         save()
         return f'{ex_note.name.value} removed'
 
 
 @input_error
 def add_tags(args):
-    df = load()
     name = args[0]
-    if df['name'].isin([name]).any():
+    if name in records:
         ex_note = Note(name)
         tags = input('Enter tags ')
         ex_note.add_tags(tags)
@@ -130,9 +125,8 @@ def add_tags(args):
 
 @input_error
 def remove_tags(args):
-    df = load()
     name = args[0]
-    if df['name'].isin([name]).any():
+    if name in records:
         ex_note = Note(name)
         ex_note.delete_tags()
         save()
@@ -143,22 +137,20 @@ def remove_tags(args):
 
 @input_error
 def filter(args):
-    df = load()
-    tag = args[0]
-    # df_filtered=df[df.tags.str.contains(tag, na=False).any()]
-    df_filtered = df[df.tags.str.contains('|'.join(tag), na=False)]
-    print(df_filtered)
+    tags = split_tags(' '.join(args))
+    if not tags:
+        raise IndexError
+    names = set().union(*(tag_index.get(tag, ()) for tag in tags))
+    print(format_table(records[name] for name in sorted(names)))
 
 
 @input_error
 def sort(a):
-    df = load()
     flag = int(input('Input 1 for sort by date of creation or 2 - by date of change '))
     if flag == 1:
-        df_sorted = df.sort_values(by='created', ascending=False)
+        print(format_table(sorted_records('created')))
     else:
-        df_sorted = df.sort_values(by='changed', ascending=False)
-    print(df_sorted)
+        print(format_table(sorted_records('changed')))
 
 
 OPTIONS = {"hello": hello,